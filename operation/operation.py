@@ -1,20 +1,18 @@
 import asyncio
-import collections
+import bisect
 import contextlib
 import discord
-import inspect
 import logging
+import multiprocessing
 import random
+import site
+from concurrent.futures import ProcessPoolExecutor
 from discord import Role, Member
-from functools import wraps
 from io import BytesIO
-from typing import Dict, List, Optional, Set, TypedDict, Union
-
-import sans
-from sans.api import Api, Dumps
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, TypedDict, Union
 
 from redbot.core import bot, checks, commands, Config
-from redbot.core.commands.requires import permissions_check
 from redbot.core.utils.mod import get_audit_reason
 from redbot.core.utils.menus import start_adding_reactions
 from redbot.core.utils.predicates import ReactionPredicate
@@ -23,6 +21,9 @@ from redbot.core.utils.predicates import ReactionPredicate
 LOG = logging.getLogger("red.operation")
 LOG.setLevel(logging.DEBUG)
 MAX_FILE = 8_000_000
+LOG_BATCH = 500
+# cogs aren't loaded from sys.path, so log pool workers need this added to import us
+_IMPORT_ROOT = str(Path(__file__).resolve().parents[__name__.count(".")])
 COMMAND = "command"
 OFFICER = "officer"
 SOLDIER = "soldier"
@@ -32,6 +33,7 @@ SOLDIER = "soldier"
 
 
 _levels = (COMMAND, OFFICER, SOLDIER)
+_LKEYS = tuple(f"{l}_role" for l in _levels)
 
 
 def requires(level):
@@ -49,10 +51,10 @@ def requires(level):
         cog = ctx.bot.get_cog(Operation.__name__)
         if not cog:
             return False
-        l_keys = [f"{l}_role" for l in _levels]
         cache = []
-        config = await cog.config.guild(ctx.guild).all()
-        for key in l_keys:
+        config = await cog._get_guild_settings(ctx.guild)
+        # resolve ids on every call so roles are never stale
+        for key in _LKEYS:
             role_id = config.get(key)
             role = ctx.guild.get_role(role_id)
             cache.append(role or role_id)
@@ -66,71 +68,135 @@ def requires(level):
 async def _requires(ctx, level):
     if not level:
         return True
-    if await ctx.bot.is_owner(ctx.author):
-        return True
     elif not isinstance(level, int):
         level = _levels.index(level)
     LOG.debug(
         "Checking %s's top role against perms: %s", ctx.author, ctx.__op_cache__[level:]
     )
-    for requirement in ctx.__op_cache__[level:]:
-        if not requirement:
-            continue
-        elif isinstance(requirement, int):
-            LOG.warning(
-                "Missing role in guild %s (%s): %s",
-                ctx.guild,
-                ctx.guild.id,
-                requirement,
-            )
-            return False
-        else:
-            return ctx.author.top_role >= requirement
+    # only the first configured requirement matters
+    requirement = next(filter(None, ctx.__op_cache__[level:]), None)
+    if isinstance(requirement, Role) and ctx.author.top_role >= requirement:
+        return True
+    if await ctx.bot.is_owner(ctx.author):
+        return True
+    if isinstance(requirement, int):
+        LOG.warning(
+            "Missing role in guild %s (%s): %s",
+            ctx.guild,
+            ctx.guild.id,
+            requirement,
+        )
     return False
 
 
-def message_format(message, last_message):
+def _log_entry(message):
+    # everything message_format needs, read on the event loop so that
+    # formatting never touches live discord.py state
+    return (
+        message.author.display_name,
+        message.author.bot,
+        message.created_at,
+        message.edited_at,
+        message.clean_content,
+        [attachment.url for attachment in message.attachments],
+    )
+
+
+def message_format(entry, last_date):
+    """Returns the encoded log lines for a ``_log_entry`` and the date it was sent."""
+    display_name, is_bot, ca, ea, content, urls = entry
     final = []
-    if not last_message:
-        final.append(str(message.created_at.date()))
-    elif message.created_at.date() != last_message.created_at.date():
-        final.extend(("", message.created_at.date().isoformat()))
-    if message.author.bot:
-        author = f"BOT {message.author.display_name}"
-    else:
-        author = message.author.display_name
-    if message.edited_at:
-        if message.edited_at.date() == message.created_at.date():
-            post = f" (edited {message.edited_at.time().isoformat('minutes')})"
-        else:
-            post = f" (edited {message.edited_at})"
+    ca_date = ca.date()
+    if not last_date:
+        final.append(ca_date.isoformat())
+    elif ca_date != last_date:
+        final.extend(("", ca_date.isoformat()))
+    if is_bot:
+        author = f"BOT {display_name}"
     else:
+        author = display_name
+    if not ea:
         post = ""
-    final.append(
-        f"[{message.created_at.time().isoformat('minutes')}] {author}: {message.clean_content}{post}"
-    )
-    final.extend(attachment.url for attachment in message.attachments)
-    return (f"{line}\n".encode("utf-8") for line in final)
+    elif ea.date() == ca_date:
+        post = f" (edited {ea.time().isoformat('minutes')})"
+    else:
+        post = f" (edited {ea})"
+    final.append(f"[{ca.time().isoformat('minutes')}] {author}: {content}{post}")
+    final.extend(urls)
+    final.append("")
+    return "\n".join(final).encode("utf-8"), ca_date
+
+
+def format_batch(entries, last_date):
+    blobs = []
+    for entry in entries:
+        blob, last_date = message_format(entry, last_date)
+        blobs.append(blob)
+    return blobs
+
+
+def _append_blobs(bufs, blobs):
+    for blob in blobs:
+        bufs[-1] += blob
+        if len(bufs[-1]) > MAX_FILE:
+            bufs.append(bytearray())
+
+
+async def _send_file(destination, file, *, tries=3):
+    for attempt in range(tries):
+        try:
+            return await destination.send(file=file)
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == tries - 1:
+                raise
+            LOG.info("Rate limited uploading %s, retrying.", file.filename)
+            file.reset()
+            await asyncio.sleep(float(e.response.headers.get("Retry-After", 1)))
 
 
-async def log(team, destination):
+async def _format_in_thread(entries, last_date):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, format_batch, entries, last_date)
+
+
+async def prepare_log(team, destination, formatter=_format_in_thread):
+    """Fetches and formats a team's log without sending anything.
+
+    ``formatter`` is awaited with the same arguments as ``format_batch``.
+    Returns ``(destination, embed, files)`` for ``send_log``, or ``None`` if
+    there is nothing to log.
+    """
     channel = team["channel"]
-    bios = [BytesIO()]
-    last_message = None
+    bufs = [bytearray()]
+    batch = []
+    pending = None
+    last_message = last_date = None
     members = set()
     async for message in channel.history(limit=None, oldest_first=True):
-        bios[-1].writelines(message_format(message, last_message))
-        if bios[-1].tell() > MAX_FILE:
-            bios.append(BytesIO())
+        batch.append(_log_entry(message))
         if not message.author.bot:
             members.add(message.author)
         last_message = message
+        if len(batch) >= LOG_BATCH:
+            # format the previous batch while the next page is being fetched
+            if pending:
+                _append_blobs(bufs, await pending)
+            pending = asyncio.ensure_future(formatter(batch, last_date))
+            last_date = last_message.created_at.date()
+            batch = []
+    if pending:
+        _append_blobs(bufs, await pending)
+    if batch:
+        _append_blobs(bufs, await formatter(batch, last_date))
     if not last_message or not members:
         LOG.info("Nothing to log.")
-        return
+        return None
     members.discard(team["leader"])
-    for bio in bios:
-        bio.seek(0)
+    if not bufs[-1]:
+        bufs.pop()
+    # a BytesIO built from bytes shares its buffer and starts at position 0
+    bios = [BytesIO(bytes(buf)) for buf in bufs]
+    del bufs
     if len(bios) == 1:
         bios = [discord.File(bios[-1], filename=f"{channel}.md")]
     else:
@@ -138,15 +204,15 @@ async def log(team, destination):
             discord.File(bio, filename=f"{channel}_part-{i}.md")
             for i, bio in enumerate(bios)
         ]
-    soldiers = team.get("soldiers", set())
+    soldiers = set(_team_soldiers(team))
+    entries = [(m, m.top_role) for m in soldiers | members]
+    entries.sort(key=lambda t: (t[1], -t[0].id), reverse=True)
     embed = (
         discord.Embed(
             title=str(channel).replace("-", " ").title(),
             description="\n".join(
-                f"{m.top_role} {m.mention}{'*' if m not in members else ('✝' if m not in soldiers else '')}"
-                for m in sorted(
-                    soldiers | members, key=lambda m: (m.top_role, -m.id), reverse=True
-                )
+                f"{top_role} {m.mention}{'*' if m not in members else ('✝' if m not in soldiers else '')}"
+                for m, top_role in entries
             )
             or "*Nobody*",
             colour=team["leader"].colour,
@@ -157,7 +223,7 @@ async def log(team, destination):
         )
         .set_thumbnail(url=team["leader"].guild.icon_url)
     )
-    if soldiers ^ members:
+    if soldiers != members:
         embed.add_field(
             name="\u200b",
             value=(
@@ -171,33 +237,100 @@ async def log(team, destination):
             "No specified logging destination for %s, logging to op channel.",
             destination,
         )
+    return destination, embed, bios
+
+
+async def send_log(destination, embed, files):
     await destination.send(embed=embed)
-    for bio in bios:
-        await destination.send(file=bio)
+    await asyncio.gather(*(_send_file(destination, file) for file in files))
+
+
+async def log(team, destination, formatter=_format_in_thread):
+    prepared = await prepare_log(team, destination, formatter)
+    if prepared:
+        await send_log(*prepared)
+
+
+def _pick_smallest_team(teams):
+    return min(teams, key=lambda t: len(t.setdefault("soldiers", [])))
+
+
+def _soldier_key(member):
+    # plain ints, since discord.py updates Role.position in place; orders roles
+    # like Role.__lt__: @everyone lowest, then a larger id ranks lower on ties
+    top_role = member.top_role
+    return (not top_role.is_default(), top_role.position, -top_role.id, -member.id)
+
+
+def _add_soldier(team, member):
+    soldiers = team.setdefault("soldiers", [])
+    if any(soldier == member for _, soldier in soldiers):
+        return
+    # keys are unique per member, so members themselves are never compared
+    bisect.insort(soldiers, (_soldier_key(member), member))
+
+
+def _remove_soldier(team, member):
+    soldiers = team.get("soldiers", [])
+    for i, (_, soldier) in enumerate(soldiers):
+        if soldier == member:
+            del soldiers[i]
+            return True
+    return False
+
+
+def _team_soldiers(team):
+    return [member for _, member in team.get("soldiers", [])]
 
 
 class OpTeam(TypedDict):
     channel: discord.TextChannel
     leader: discord.Member
-    soldiers: Set[discord.Member]
+    # (_soldier_key(member), member), lowest rank first
+    soldiers: List[Tuple[tuple, discord.Member]]
 
 
 class OpDict(TypedDict):
     category: discord.CategoryChannel
     staging: discord.VoiceChannel
     teams: List[OpTeam]
+    leaders: Dict[discord.Member, OpTeam]
+    channels: Dict[discord.TextChannel, OpTeam]
     blacklist: Set[discord.Member]
 
 
 class Operation(commands.Cog):
-    _shutdown_cmds = ("shutdown", "restart")
+    _shutdown_cmds = frozenset({"shutdown", "restart"})
+    _DEFAULT_ROLE_OVERS = dict(
+        read_messages=False,
+        send_messages=False,
+        manage_messages=False,
+        read_message_history=True,
+        add_reactions=False,
+        mention_everyone=False,
+        connect=False,
+        speak=False,
+    )
+    _COMMAND_OVERS = dict(mention_everyone=True, manage_messages=True)
+    _BOT_OVERS = dict(
+        read_messages=True,
+        send_messages=True,
+        manage_messages=True,
+        connect=True,
+        move_members=True,
+        mention_everyone=True,
+    )
 
     def __init__(self, bot: bot.Red):
         super().__init__()
         self.bot = bot
-        for cmd in self._shutdown_cmds:
-            if command := bot.get_command(cmd):
-                command.add_check(self._shutdown_check)
+        # the commands actually patched here, rather than _shutdown_cmds,
+        # are what cog_unload un-patches
+        self._patched_cmds: List[commands.Command] = [
+            command for command in map(bot.get_command, self._shutdown_cmds) if command
+        ]
+        for command in self._patched_cmds:
+            command.add_check(self._shutdown_check)
         """
         Guild: {
             Category: CategoryChannel
@@ -206,13 +339,16 @@ class Operation(commands.Cog):
                 {
                     Channel: TextChannel
                     Leader: Member  # make plural for shotgun ops... later
-                    Soldiers: {Member...}
+                    Soldiers: [(key, Member)...]  # sorted by _soldier_key
                 }
             ]
             Blacklist: {Member...}
         }
         """
         self.operations: Dict[discord.Guild, OpDict] = {}
+        self._settings_cache: Dict[int, dict] = {}
+        self._log_pool: Optional[ProcessPoolExecutor] = None
+        self._log_pool_failed = False
         self.config = Config.get_conf(
             self, identifier=2_113_674_295, force_registration=True
         )
@@ -220,6 +356,54 @@ class Operation(commands.Cog):
             op_archive=None, op_category=None, **{f"{l}_role": None for l in _levels}
         )
 
+    async def _get_guild_settings(self, guild):
+        settings = self._settings_cache.get(guild.id)
+        if settings is None:
+            settings = await self.config.guild(guild).all()
+            self._settings_cache[guild.id] = settings
+        return settings
+
+    def _invalidate_guild_cache(self, guild):
+        self._settings_cache.pop(guild.id, None)
+
+    def _get_log_pool(self):
+        if self._log_pool is None and not self._log_pool_failed:
+            try:
+                # spawn, since forking a running bot can deadlock
+                self._log_pool = ProcessPoolExecutor(
+                    max_workers=2,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=site.addsitedir,
+                    initargs=(_IMPORT_ROOT,),
+                )
+            except Exception:
+                LOG.exception("Couldn't create the log pool.")
+                self._log_pool_failed = True
+        return self._log_pool
+
+    def _drop_log_pool(self):
+        self._log_pool_failed = True
+        if self._log_pool is not None:
+            self._log_pool.shutdown(wait=False)
+            self._log_pool = None
+
+    async def _format_log_batch(self, entries, last_date):
+        pool = self._get_log_pool()
+        if pool is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    pool, format_batch, entries, last_date
+                )
+            except Exception:
+                # never let the pool stop an op from being archived
+                LOG.warning(
+                    "Log pool failed, formatting logs in a thread instead.",
+                    exc_info=True,
+                )
+                self._drop_log_pool()
+        return await _format_in_thread(entries, last_date)
+
     def _shutdown_check(self, ctx):
         if self.operations:
             raise commands.UserFeedbackCheckFailure(
@@ -235,10 +419,11 @@ class Operation(commands.Cog):
         return {}  # nothing to get
 
     def cog_unload(self):
-        for cmd in self._shutdown_cmds:
-            if command := self.bot.get_command(cmd):
-                with contextlib.suppress(ValueError):
-                    command.checks.remove(self._shutdown_check)
+        if self._log_pool is not None:
+            self._log_pool.shutdown(wait=False)
+        for command in self._patched_cmds:
+            with contextlib.suppress(ValueError):
+                command.checks.remove(self._shutdown_check)
 
     def cog_command_error(self, ctx, error):
         if isinstance(error, commands.CommandInvokeError):
@@ -261,7 +446,7 @@ class Operation(commands.Cog):
         You should probably leave this to Darc to handle.
         """
         if not ctx.invoked_subcommand:
-            settings = await self.config.guild(ctx.guild).all()
+            settings = await self._get_guild_settings(ctx.guild)
             await ctx.send(
                 "\n".join(
                     f"{level.title()}: {ctx.guild.get_role(settings[f'{level}_role'])}"
@@ -273,26 +458,31 @@ class Operation(commands.Cog):
     @checks.admin_or_permissions(administrator=True)
     async def command(self, ctx, *, role: Role):
         await self.config.guild(ctx.guild).command_role.set(role.id)
+        self._invalidate_guild_cache(ctx.guild)
         await ctx.tick()
 
     @opset.command()
     async def officer(self, ctx, *, role: Role):
         await self.config.guild(ctx.guild).officer_role.set(role.id)
+        self._invalidate_guild_cache(ctx.guild)
         await ctx.tick()
 
     @opset.command()
     async def soldier(self, ctx, *, role: Role):
         await self.config.guild(ctx.guild).soldier_role.set(role.id)
+        self._invalidate_guild_cache(ctx.guild)
         await ctx.tick()
 
     @opset.command()
     async def category(self, ctx, *, category: discord.CategoryChannel):
         await self.config.guild(ctx.guild).op_category.set(category.id)
+        self._invalidate_guild_cache(ctx.guild)
         await ctx.tick()
 
     @opset.command()
     async def archive(self, ctx, *, channel: discord.TextChannel):
         await self.config.guild(ctx.guild).op_archive.set(channel.id)
+        self._invalidate_guild_cache(ctx.guild)
         await ctx.tick()
 
     @commands.command(usage="[shotgun_teams] [team_leaders...] [joint_roles...]")
@@ -381,27 +571,10 @@ class Operation(commands.Cog):
                 )
             cat_overs = {
                 ctx.guild.default_role: discord.PermissionOverwrite(
-                    read_messages=False,
-                    send_messages=False,
-                    manage_messages=False,
-                    read_message_history=True,
-                    add_reactions=False,
-                    mention_everyone=False,
-                    connect=False,
-                    speak=False,
-                ),
-                highest_role: discord.PermissionOverwrite(
-                    mention_everyone=True,
-                    manage_messages=True,
-                ),
-                ctx.me: discord.PermissionOverwrite(
-                    read_messages=True,
-                    send_messages=True,
-                    manage_messages=True,
-                    connect=True,
-                    move_members=True,
-                    mention_everyone=True,
+                    **self._DEFAULT_ROLE_OVERS
                 ),
+                highest_role: discord.PermissionOverwrite(**self._COMMAND_OVERS),
+                ctx.me: discord.PermissionOverwrite(**self._BOT_OVERS),
             }
             staging_overs = cat_overs.copy()
             for role in args[Role]:
@@ -427,21 +600,28 @@ class Operation(commands.Cog):
                 )
             reason = get_audit_reason(ctx.author, "Operation start.")
             cat = ctx.guild.get_channel(
-                await self.config.guild(ctx.guild).op_category()
+                (await self._get_guild_settings(ctx.guild))["op_category"]
             )
             if not cat:
                 cat = await ctx.guild.create_category(
                     name="Operation", overwrites=cat_overs, reason=reason
                 )
                 await self.config.guild(ctx.guild).op_category.set(cat.id)
+                self._invalidate_guild_cache(ctx.guild)
             else:
                 current_overs = cat.overwrites
+                tasks = []
                 for item, overs in cat_overs.items():
                     c = current_overs.pop(item, None)
                     if c != overs:
-                        await cat.set_permissions(item, overwrite=overs, reason=reason)
-                for item, overs in current_overs.items():
-                    await cat.set_permissions(item, overwrite=None, reason=reason)
+                        tasks.append(
+                            cat.set_permissions(item, overwrite=overs, reason=reason)
+                        )
+                for item in current_overs:
+                    tasks.append(
+                        cat.set_permissions(item, overwrite=None, reason=reason)
+                    )
+                await asyncio.gather(*tasks)
             op["category"] = cat
             if team_count > 1:
                 c = [
@@ -466,6 +646,8 @@ class Operation(commands.Cog):
                 {"leader": args[Member][i], "channel": channels[i]}
                 for i in range(team_count)
             ]
+            op["leaders"] = {t["leader"]: t for t in op["teams"]}
+            op["channels"] = {t["channel"]: t for t in op["teams"]}
             staging = cat.voice_channels
             if not staging:
                 staging = await cat.create_voice_channel(
@@ -499,22 +681,34 @@ class Operation(commands.Cog):
         """
         if ctx.guild not in self.operations:
             return
-        if ctx.author not in (
-            t["leader"] for t in self.operations[ctx.guild]["teams"]
-        ) and not (await _requires(ctx, COMMAND)):
+        if ctx.author not in self.operations[ctx.guild]["leaders"] and not (
+            await _requires(ctx, COMMAND)
+        ):
             return await ctx.send("Only op leaders and Command can end ops")
         op = self.operations.pop(ctx.guild)
         reason = get_audit_reason(ctx.author, "Operation end.")
         async with ctx.typing():
             archives = ctx.guild.get_channel(
-                await self.config.guild(ctx.guild).op_archive()
+                (await self._get_guild_settings(ctx.guild))["op_archive"]
             )
-            for team in op["teams"]:
-                await log(team, archives)
+            logs = await asyncio.gather(
+                *(
+                    prepare_log(team, archives, self._format_log_batch)
+                    for team in op["teams"]
+                )
+            )
+            # send in team order so each summary is directly followed by its files
+            for prepared in logs:
+                if prepared:
+                    await send_log(*prepared)
+
+            async def _close(team):
                 if archives:
                     await team["channel"].delete(reason=reason)
                 else:
                     await team["channel"].edit(sync_permissions=True, reason=reason)
+
+            await asyncio.gather(*(_close(team) for team in op["teams"]))
             await op["category"].voice_channels[-1].edit(
                 name="🚫", sync_permissions=True, reason=reason
             )
@@ -532,18 +726,21 @@ class Operation(commands.Cog):
             return await ctx.send("I cannot let you do that. Self-harm is bad 😔")
         op = self.operations[ctx.guild]
         is_special = ctx.author == ctx.guild.owner or await ctx.bot.is_owner(ctx.author)
-        if not is_special and member.top_role >= ctx.author.top_role:
+        author_top = ctx.author.top_role
+        if not is_special and member.top_role >= author_top:
             return await ctx.send(f"You can't {ctx.invoked_with} higher ranks.")
+        if member in op["leaders"]:
+            return await ctx.send(
+                f"You can't {ctx.invoked_with} leaders. Use `{ctx.prefix}disband` instead."
+            )
+        tasks = []
         for team in op["teams"]:
-            if member == team["leader"]:
-                return await ctx.send(
-                    f"You can't {ctx.invoked_with} leaders. Use `{ctx.prefix}disband` instead."
-                )
-            if member not in team["soldiers"]:
+            if not _remove_soldier(team, member):
                 continue
-            team["soldiers"].remove(member)
-            await team["channel"].set_permissions(member, overwrite=None)
-            await op["staging"].set_permissions(member, overwrite=None)
+            tasks.append(team["channel"].set_permissions(member, overwrite=None))
+        if tasks:
+            tasks.append(op["staging"].set_permissions(member, overwrite=None))
+        await asyncio.gather(*tasks)
         await ctx.send(f"Member {member} has been kicked from this op.")
 
     @commands.command()
@@ -558,18 +755,20 @@ class Operation(commands.Cog):
             return await ctx.send("I cannot let you do that. Self-harm is bad 😔")
         op = self.operations[ctx.guild]
         is_special = ctx.author == ctx.guild.owner or await ctx.bot.is_owner(ctx.author)
-        if not is_special and member.top_role >= ctx.author.top_role:
+        author_top = ctx.author.top_role
+        if not is_special and member.top_role >= author_top:
             return await ctx.send(f"You can't {ctx.invoked_with} higher ranks.")
         op.setdefault("blacklist", set()).add(member)
+        if member in op["leaders"]:
+            return await ctx.send(
+                f"You can't {ctx.invoked_with} leaders. Use `{ctx.prefix}disband` instead."
+            )
+        tasks = []
         for team in op["teams"]:
-            if member == team["leader"]:
-                return await ctx.send(
-                    f"You can't {ctx.invoked_with} leaders. Use `{ctx.prefix}disband` instead."
-                )
-            if member not in team["soldiers"]:
+            if not _remove_soldier(team, member):
                 continue
-            team["soldiers"].remove(member)
-            await team["channel"].set_permissions(member, overwrite=None)
+            tasks.append(team["channel"].set_permissions(member, overwrite=None))
+        await asyncio.gather(*tasks)
         await ctx.send(f"Member {member} has been banned from this op.")
 
     @commands.command(hidden=True)
@@ -580,10 +779,8 @@ class Operation(commands.Cog):
         op = self.operations[ctx.guild]
         from_team = from_team or ctx.author
         if isinstance(from_team, Member):
-            for team in op["teams"]:
-                if team["leader"] == from_team:
-                    break
-            else:
+            team = op["leaders"].get(from_team)
+            if not team:
                 return await ctx.send(
                     f"I couldn't find a team with leader {from_team}."
                 )
@@ -604,39 +801,32 @@ class Operation(commands.Cog):
         if leader != ctx.author and not (await _requires(ctx, COMMAND)):
             return await ctx.send(f"Only Command can disband other teams.")
         # get leader's team
-        teams = self.operations[ctx.guild]["teams"]
+        op = self.operations[ctx.guild]
+        teams = op["teams"]
         if len(teams) == 1:
             return await ctx.send(
                 f"There's only one team left. Use `{ctx.prefix}update_over` instead."
             )
-        for i, team in enumerate(teams):
-            if team["leader"] == leader:
-                break
-        else:
+        team = op["leaders"].get(leader)
+        if not team:
             return await ctx.send(f"No team found led by {leader}.")
         LOG.warning(
-            "Stopped %sdisband. Debug information to follow.\n"
-            "Team: %s\nLeader: %s\nPopped: %s",
+            "Stopped %sdisband. Debug information to follow.\nTeam: %s\nLeader: %s",
             ctx.prefix,
             team,
             leader,
-            teams[i],
         )
         return await ctx.send(
             "Since this command doesn't currently work, I haven't changed anything. Logs have been taken."
         )
         # pylint: disable=unreachable
-        teams.pop(i)
+        teams.remove(team)
+        del op["leaders"][leader]
+        del op["channels"][team["channel"]]
         # distribute leader's team
-        for member in team["soldiers"]:
-            if len(teams) == 1:
-                team = teams[0]
-            else:
-                weights = [len(t.setdefault("soldiers", set())) for t in teams]
-                m = max(weights)
-                weights = [m - w for w in weights]
-                team = random.choices(teams, weights)[0]
-            team.setdefault("soldiers", set()).add(member)
+        for member in _team_soldiers(team):
+            team = _pick_smallest_team(teams)
+            _add_soldier(team, member)
             overs = team["channel"].overwrites_for(member)
             overs.update(read_messages=True, send_messages=True)
             # assign permissions
@@ -646,9 +836,9 @@ class Operation(commands.Cog):
             )
         # archive op channel
         archives = ctx.guild.get_channel(
-            await self.config.guild(ctx.guild).op_archive()
+            (await self._get_guild_settings(ctx.guild))["op_archive"]
         )
-        await log(team, archives)
+        await log(team, archives, self._format_log_batch)
         if archives:
             await team["channel"].delete()
         else:
@@ -661,14 +851,13 @@ class Operation(commands.Cog):
             return
         op = self.operations[ctx.guild]
         member = ctx.author
+        if member in op["leaders"]:
+            return await ctx.send(
+                f"You can't {ctx.invoked_with} leaders. Use `{ctx.prefix}disband` instead."
+            )
         for team in op["teams"]:
-            if member == team["leader"]:
-                return await ctx.send(
-                    f"You can't {ctx.invoked_with} leaders. Use `{ctx.prefix}disband` instead."
-                )
-            if member not in team["soldiers"]:
+            if not _remove_soldier(team, member):
                 continue
-            team["soldiers"].remove(member)
             await asyncio.gather(
                 team["channel"].set_permissions(member, overwrite=None),
                 op["staging"].set_permissions(member, overwrite=None),
@@ -681,10 +870,8 @@ class Operation(commands.Cog):
             return
         op = self.operations[ctx.guild]
         leader = leader or ctx.channel
-        for team in op["teams"]:
-            if leader in (team["leader"], team["channel"]):
-                break
-        else:
+        team = op["leaders"].get(leader) or op["channels"].get(leader)
+        if not team:
             return await ctx.send(
                 "I couldn't find the team you were trying to get info on."
             )
@@ -693,14 +880,7 @@ class Operation(commands.Cog):
             .add_field(name="Leader", value=team["leader"].mention, inline=False)
             .add_field(
                 name="Soldiers",
-                value="\n".join(
-                    m.mention
-                    for m in sorted(
-                        team["soldiers"],
-                        key=lambda m: (m.top_role, -m.id),
-                        reverse=True,
-                    )
-                ),
+                value="\n".join(m.mention for m in reversed(_team_soldiers(team))),
                 inline=False,
             )
         )
@@ -720,17 +900,8 @@ class Operation(commands.Cog):
         if member in op.setdefault("blacklist", set()):
             return
         # assign member
-        teams = op["teams"]
-        if len(teams) == 1:
-            team = teams[0]
-        else:
-            weights = [len(t.setdefault("soldiers", set())) for t in teams]
-            m = max(weights)
-            weights = [m - w for w in weights]
-            if not any(weights):
-                weights = [1] * len(weights)
-            team = random.choices(teams, weights)[0]
-        team.setdefault("soldiers", set()).add(member)
+        team = _pick_smallest_team(op["teams"])
+        _add_soldier(team, member)
         overs = team["channel"].overwrites_for(member)
         overs.update(read_messages=True, send_messages=True)
         # assign permissions